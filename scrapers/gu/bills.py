@@ -1,30 +1,76 @@
+import datetime
 import dateutil
-import lxml.html
-import pytz
+import fitz
+import html
 import re
-import tempfile
 
+from io import BytesIO
+from urllib.parse import urljoin
+from zoneinfo import ZoneInfo
 from openstates.scrape import Scraper, Bill
-from openstates.utils import convert_pdf
 from scrapelib import HTTPError
 
 
 class GUBillScraper(Scraper):
-    _tz = pytz.timezone("Pacific/Guam")
-    # non-greedy match on bills in the "list" page
-    bill_match_re = re.compile("(<p>.*?<br>)", re.DOTALL)
-    res_match_re = re.compile('(<p align="left">.*?<br>)', re.DOTALL)
+    # Guam has no DST, so attaching the zone directly is always correct
+    _tz = ZoneInfo("Pacific/Guam")
+    # match bills in the "list" page up to the first <br>, consuming runs of
+    # non-tag text at once rather than stepping over every character
+    bill_match_re = re.compile(r"(<p>[^<]*(?:<(?!br>)[^<]*)*<br>)")
+    res_match_re = re.compile(r'(<p align="left">[^<]*(?:<(?!br>)[^<]*)*<br>)')
     sponsors_match_re = re.compile(r"Sponsor\(s\) -(.*)<p", re.DOTALL)
     desc_match_re = re.compile(r"^\s?<p>(.*?)<li>", re.DOTALL)
     res_desc_match_re = re.compile('<p align="left">([^<>]+)')
-    filtered_details = ["BILL HISTORY", "Bill HISTORY", "CLERKS OFFICE", "Page 1"]
-    date_re = re.compile("([0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4})")
+    # the index chunks are tiny, so pull links and names out without an html parser
+    # hrefs may be double quoted, single quoted or bare
+    link_re = re.compile(
+        r"<a\s[^>]*?href\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))[^>]*>([^<]*)",
+        re.I,
+    )
+    # <li> items are read one at a time, each ending at its close tag or the next <li>
+    list_item_re = re.compile(r"<li\b[^>]*>", re.I)
+    list_item_end_re = re.compile(r"</(?:li|ul|ol)\b", re.I)
+    strong_re = re.compile(r"<strong\b[^>]*>([^<]*)", re.I)
+    filtered_details = frozenset(
+        ("BILL HISTORY", "Bill HISTORY", "CLERKS OFFICE", "Page 1")
+    )
+    time_re = re.compile(r"[0-9]{1,2}:[0-9]{2}\s[apAP]\.?[mM]\.?")
+    # dates optionally followed by a time, so one pass finds both kinds
     date_time_re = re.compile(
-        r"([0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}\s?\n?[0-9]{1,2}:[0-9]{2}\s[apAP]\.?[mM]\.?)",
+        r"(?P<date>[0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4})"
+        rf"(?:\s?(?P<time>{time_re.pattern}))?",
+    )
+    # the name may start on the next line when the pdf wraps right after "on "
+    committee_re = re.compile("([cC]ommittee on ([a-zA-Z, ]+|$))")
+    committee_tail_re = re.compile("[a-zA-Z, ]+")
+    whitespace_re = re.compile(r"\s+")
+    # formats seen in the status PDFs, dateutil is only a fallback
+    date_formats = (
+        "%m/%d/%Y %I:%M %p",
+        "%m/%d/%y %I:%M %p",
+        "%m/%d/%Y",
+        "%m/%d/%y",
     )
-    committee_re = re.compile("([cC]ommittee on [a-zA-Z, \n]+)")
 
-    def _download_pdf(self, url: str):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # status PDFs are shared between bills, so keep parsed details by
+        # (kind, url) since bill and resolution details have different keys
+        self._pdf_cache = {}
+
+    def _parse_date(self, date: str):
+        # "1/23/2023\n10:15 a.m." -> "1/23/2023 10:15 AM"
+        normalized = self.whitespace_re.sub(" ", date.replace(".", "").upper()).strip()
+        for date_format in self.date_formats:
+            try:
+                return datetime.datetime.strptime(normalized, date_format).replace(
+                    tzinfo=self._tz
+                )
+            except ValueError:
+                continue
+        return dateutil.parser.parse(date).replace(tzinfo=self._tz)
+
+    def _iter_text(self, url: str):
         try:
             res = self.get(url)
         except HTTPError:
@@ -32,70 +78,128 @@ class GUBillScraper(Scraper):
             msg = "No document found at url %r" % url
             self.logger.warning(msg)
             return
-        fd = tempfile.NamedTemporaryFile()
-        fd.write(res.content)
-        text = convert_pdf(fd.name, type="xml")
-        data = lxml.html.fromstring(text).xpath("//text")
         # filter out empty and obvious text we don't need
-        return "\n".join(
-            [
-                d.text
-                for d in data
-                if d.text
-                and d.text.strip()
-                and d.text.strip() not in self.filtered_details
-            ]
+        filtered = self.filtered_details
+        # pages are only read as the lines are consumed, so a caller that stops
+        # early closes the generator and the document without reading the rest
+        with fitz.open("pdf", BytesIO(res.content)) as doc:
+            for page in doc:
+                for line in page.get_text("text").splitlines():
+                    if (stripped := line.strip()) and stripped not in filtered:
+                        yield line
+
+    def _scan_text(self, lines, find_committee: bool = False):
+        # only the first few dates are used, so stop reading once we have them
+        full_dates = []
+        days = []
+        committee = None
+        # a date ending one line may have its time at the start of the next,
+        # and a committee name may run on over several lines
+        pending_date = None
+        in_committee = False
+        name_pending = False
+        for line in lines:
+            if pending_date:
+                time = self.time_re.match(line)
+                if time:
+                    full_dates.append(f"{pending_date}\n{time.group(0)}")
+                pending_date = None
+            if in_committee:
+                name_pending = False
+                tail = self.committee_tail_re.match(line)
+                if tail:
+                    committee += "\n" + tail.group(0)
+                in_committee = bool(tail) and tail.end() == len(line)
+            elif find_committee and committee is None:
+                match = self.committee_re.search(line)
+                if match:
+                    committee = match.group(1)
+                    in_committee = match.end() == len(line)
+                    # nothing after "on ", so the name is on the next line
+                    name_pending = not match.group(2)
+            for match in self.date_time_re.finditer(line):
+                days.append(match["date"])
+                if match["time"]:
+                    full_dates.append(match.group(0))
+                elif len(line) - match.end() < 2 and not line[match.end() :].strip():
+                    pending_date = match.group(0)
+            # resolutions only use the first two date-times, bills also need
+            # the third date and the committee
+            if len(full_dates) > 1 and (
+                not find_committee or (len(days) > 2 and committee and not in_committee)
+            ):
+                break
+        if name_pending:
+            # "Committee on " was the last text in the pdf
+            committee = None
+        return full_dates, days, committee
+
+    def _make_link(self, match: re.Match, root_url: str):
+        *hrefs, title = match.groups()
+        href = next(href for href in hrefs if href is not None)
+        return (
+            urljoin(root_url, html.unescape(href).strip()),
+            html.unescape(title),
         )
 
+    def _first_link(self, chunk: str, root_url: str):
+        match = self.link_re.search(chunk)
+        if not match:
+            raise ValueError(f"No link found in entry from {root_url}: {chunk!r}")
+        return self._make_link(match, root_url)
+
+    def _find_list_links(self, chunk: str, root_url: str):
+        # the first link in each <li>, or None for an item without one
+        links = []
+        for item in self.list_item_re.split(chunk)[1:]:
+            item = self.list_item_end_re.split(item, 1)[0]
+            match = self.link_re.search(item)
+            links.append(self._make_link(match, root_url) if match else None)
+        return links
+
     def _get_bill_details(self, url: str):
-        text_only = self._download_pdf(url)
-        if not text_only:
-            return {}
+        if ("bill", url) in self._pdf_cache:
+            return self._pdf_cache[("bill", url)]
         details = {"IntroducedDate": None, "ReferredDate": None, "Committee": None}
-        full_dates = self.date_time_re.findall(text_only)
-        days = self.date_re.findall(text_only)
-        if full_dates:
-            details["IntroducedDate"] = self._tz.localize(
-                dateutil.parser.parse(full_dates[1])
-            )
+        full_dates, days, committee = self._scan_text(
+            self._iter_text(url), find_committee=True
+        )
+        # the first date-time is not the introduction, so we need at least two
+        if len(full_dates) > 1:
+            details["IntroducedDate"] = self._parse_date(full_dates[1])
         if len(days) > 2:
-            details["ReferredDate"] = self._tz.localize(dateutil.parser.parse(days[2]))
-        committee = self.committee_re.search(text_only)
+            details["ReferredDate"] = self._parse_date(days[2])
         if committee:
-            details["Committee"] = " ".join(
-                committee.group(1).replace("\n", " ").split()
-            )
+            details["Committee"] = self.whitespace_re.sub(" ", committee).strip()
+        self._pdf_cache[("bill", url)] = details
         return details
 
     def _get_resolution_details(self, url: str):
-        text_only = self._download_pdf(url)
-        if not text_only:
-            return {}
+        if ("resolution", url) in self._pdf_cache:
+            return self._pdf_cache[("resolution", url)]
         details = {
             "IntroducedDate": None,
             "PresentationDate": None,
         }
-        full_dates = self.date_time_re.findall(text_only)
+        full_dates, _, _ = self._scan_text(self._iter_text(url))
         if full_dates:
-            details["IntroducedDate"] = self._tz.localize(
-                dateutil.parser.parse(full_dates[0])
-            )
+            details["IntroducedDate"] = self._parse_date(full_dates[0])
             if len(full_dates) > 1:
-                details["PresentationDate"] = self._tz.localize(
-                    dateutil.parser.parse(full_dates[1])
-                )
+                details["PresentationDate"] = self._parse_date(full_dates[1])
+        self._pdf_cache[("resolution", url)] = details
         return details
 
     def _process_bill(self, session: str, bill: str, root_url: str):
-        xml = lxml.html.fromstring(bill)
-        xml.make_links_absolute(root_url)
         # Bill No. 163-37 (LS) or Bill No. 160-37 (LS) - WITHDRAWN match
-        name_parts = (
-            xml.xpath("//strong")[0].text.strip().removeprefix("Bill No. ").split()
-        )
+        strong = self.strong_re.search(bill)
+        if not strong:
+            raise ValueError(f"No bill number found in entry from {root_url}: {bill!r}")
+        strong_text = html.unescape(strong.group(1)).strip()
+        name_parts = strong_text.removeprefix("Bill No. ").split()
         name = f'B-{name_parts[0].strip().removeprefix("Bill No. ")}'
         # bill_type = name_parts[1].strip("(").strip(")")
-        bill_link = xml.xpath("//a/@href")[0]
+        # only the first link is used, so resolve just that one
+        bill_link, _ = self._first_link(bill, root_url)
         bill_obj = Bill(
             name,
             legislative_session=session,
@@ -104,7 +208,7 @@ class GUBillScraper(Scraper):
         )
         bill_obj.add_source(root_url, note="Bill Index")
         # withdrawn bills don't have regular links, so we dig elsewhere
-        if "WITHDRAWN" in "".join(name_parts):
+        if "WITHDRAWN" in strong_text:
             bill_obj.add_source(url=bill_link, note="Bill Introduced")
             details = self._get_bill_details(bill_link)
             if details.get("IntroducedDate", None):
@@ -125,12 +229,17 @@ class GUBillScraper(Scraper):
                         chamber="legislature",
                     )
 
-            yield bill_obj
+            return bill_obj
         else:
             bill_obj.add_version_link(
                 url=bill_link, note="Bill Introduced", media_type="application/pdf"
             )
-            status = xml.xpath("//li")[0].xpath("a/@href")[0]
+            links = self._find_list_links(bill, root_url)
+            if not links or not links[0]:
+                raise ValueError(
+                    f"No status link found in entry from {root_url}: {bill!r}"
+                )
+            status = links[0][0]
             bill_obj.add_source(url=status, note="Bill Status")
             description = (
                 self.desc_match_re.search(bill).group(1).strip().split("<p>")[-1]
@@ -157,9 +266,7 @@ class GUBillScraper(Scraper):
                     primary=False,
                 )
 
-            for link in xml.xpath("//li")[1:]:
-                url = link.xpath("a/@href")[0]
-                title = link.xpath("a")[0].text
+            for url, title in filter(None, links[1:]):
                 if "fiscal note" in title.lower():
                     bill_obj.add_document_link(
                         url=url,
@@ -194,15 +301,13 @@ class GUBillScraper(Scraper):
                         details["ReferredDate"],
                         chamber="legislature",
                     )
-            yield bill_obj
+            return bill_obj
 
     def _process_resolution(self, session: str, bill: str, root_url: str):
-        xml = lxml.html.fromstring(bill)
-        xml.make_links_absolute(root_url)
-        res_parts = xml.xpath("//a")[0].text.removeprefix("Resolution No. ").split()
+        bill_link, res_title = self._first_link(bill, root_url)
+        res_parts = res_title.removeprefix("Resolution No. ").split()
         name = f"R-{res_parts[0].strip()}"
         # res_type = res_parts[1].strip(")").strip("(")
-        bill_link = xml.xpath("//a/@href")[0]
         bill_obj = Bill(
             name,
             legislative_session=session,
@@ -231,7 +336,7 @@ class GUBillScraper(Scraper):
             result_data = result_data.split()
             result = result_data[0]
             if len(result_data) > 1:
-                result_date = self._tz.localize(dateutil.parser.parse(result_data[1]))
+                result_date = self._parse_date(result_data[1])
 
         if result and result_date:
             bill_obj.add_action(result, result_date, chamber="legislature")
@@ -249,9 +354,7 @@ class GUBillScraper(Scraper):
                 classification="cosponsor",
                 primary=False,
             )
-        for link in xml.xpath("//li"):
-            url = link.xpath("a/@href")[0]
-            title = link.xpath("a")[0].text
+        for url, title in filter(None, self._find_list_links(bill, root_url)):
             if "fiscal note" in title.lower():
                 bill_obj.add_document_link(
                     url=url,
@@ -280,16 +383,25 @@ class GUBillScraper(Scraper):
             bill_obj.add_action(
                 "Presented", details["PresentationDate"], chamber="legislature"
             )
-        yield bill_obj
+        return bill_obj
 
     def scrape(self, session):
         bills_url = f"https://guamlegislature.com/{session}_Guam_Legislature/{session}_bills_intro_content.htm"
-        doc = self.get(bills_url).text.split("-->")[-1]
-        for bill in self.bill_match_re.findall(doc):
-            yield self._process_bill(session, bill, bills_url)
+        doc = self.get(bills_url).text
+        # bills follow the final html comment, if there is one
+        start = doc.rfind("-->")
+        start = start + len("-->") if start != -1 else 0
+        for match in self.bill_match_re.finditer(doc, start):
+            yield self._process_bill(session, match.group(1), bills_url)
 
         # resolutions are at a separate address
         res_url = f"https://guamlegislature.com/{session}_Guam_Legislature/{session}_res_content.htm"
-        doc = self.get(res_url).text.split("-->")[-2]
-        for resolution in self.res_match_re.findall(doc):
-            yield self._process_resolution(session, resolution, res_url)
+        doc = self.get(res_url).text
+        # resolutions sit between the last two html comments
+        end = doc.rfind("-->")
+        if end == -1:
+            raise ValueError(f"No html comment ending the resolution list at {res_url}")
+        start = doc.rfind("-->", 0, end)
+        start = start + len("-->") if start != -1 else 0
+        for match in self.res_match_re.finditer(doc, start, end):
+            yield self._process_resolution(session, match.group(1), res_url)
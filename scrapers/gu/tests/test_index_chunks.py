@@ -0,0 +1,121 @@
+import shutil
+import tempfile
+import unittest
+
+from .. import Guam
+from ..bills import GUBillScraper
+
+ROOT = "https://guamlegislature.com/37th_Guam_Legislature/"
+BILLS_URL = ROOT + "37th_bills_intro_content.htm"
+RES_URL = ROOT + "37th_res_content.htm"
+
+BILL = """<p><strong>Bill No. 5-37 (COR)</strong>
+<a href="Bills_Introduced_37th/B5.pdf" target="_blank">Introduced</a>
+<p>AN ACT TO AMEND SECTION 1 OF TITLE 5<li><a href='Bill_Status/B5.pdf'>Status</a></li>
+<li><a href=Fiscal_Notes/FN5.pdf>Fiscal Note</a></li>
+<li>Committee Report pending</li>
+<li>See <a href=" Reports/CR5.pdf ">Committee Report &amp; Substitute</a></li>
+Sponsor(s) - Therese M. Terlaje /
+Joe S. San Agustin<p>
+<br>"""
+
+WITHDRAWN = """<p><strong>Bill No. 160-37 (LS) - WITHDRAWN</strong>
+<a href="Bills_Withdrawn/B160.pdf">Withdrawn</a><br>"""
+
+RESOLUTION = """<p align="left">Relative to recognizing the Guam teams
+<a href='Res_Introduced/R12.pdf'>Resolution No. 12-37 (COR)</a>
+<li><a href=Res_Fiscal/R12.pdf>Fiscal Note &amp; Review</a></li>
+Sponsor(s) - Joe S. San Agustin /
+Tina Rose Barnes</p><p>
+<br>"""
+
+
+def version_urls(bill):
+    return [(v["note"], link["url"]) for v in bill.versions for link in v["links"]]
+
+
+class TestIndexChunks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.scraper = GUBillScraper(Guam(), self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_bill(self):
+        # skip the status PDF download
+        self.scraper._pdf_cache[("bill", ROOT + "Bill_Status/B5.pdf")] = {}
+        bill = self.scraper._process_bill("37th", BILL, BILLS_URL)
+        self.assertEqual(bill.identifier, "B-5-37")
+        self.assertEqual(bill.title, "An Act To Amend Section 1 Of Title 5")
+        self.assertIn(
+            {"url": ROOT + "Bill_Status/B5.pdf", "note": "Bill Status"}, bill.sources
+        )
+        self.assertEqual(
+            version_urls(bill),
+            [
+                ("Bill Introduced", ROOT + "Bills_Introduced_37th/B5.pdf"),
+                ("Committee Report & Substitute", ROOT + "Reports/CR5.pdf"),
+            ],
+        )
+        self.assertEqual(
+            [link["url"] for d in bill.documents for link in d["links"]],
+            [ROOT + "Fiscal_Notes/FN5.pdf"],
+        )
+        self.assertEqual(
+            [s["name"] for s in bill.sponsorships],
+            ["Therese M. Terlaje", "Joe S. San Agustin"],
+        )
+
+    def test_withdrawn_bill(self):
+        self.scraper._pdf_cache[("bill", ROOT + "Bills_Withdrawn/B160.pdf")] = {}
+        bill = self.scraper._process_bill("37th", WITHDRAWN, BILLS_URL)
+        self.assertEqual(bill.identifier, "B-160-37")
+        self.assertIn(
+            {"url": ROOT + "Bills_Withdrawn/B160.pdf", "note": "Bill Introduced"},
+            bill.sources,
+        )
+        self.assertEqual(bill.versions, [])
+
+    def test_resolution(self):
+        self.scraper._pdf_cache[("resolution", ROOT + "Res_Introduced/R12.pdf")] = {}
+        bill = self.scraper._process_resolution("37th", RESOLUTION, RES_URL)
+        self.assertEqual(bill.identifier, "R-12-37")
+        self.assertEqual(bill.title, "Relative to recognizing the Guam teams")
+        self.assertEqual(
+            [link["url"] for d in bill.documents for link in d["links"]],
+            [ROOT + "Res_Fiscal/R12.pdf"],
+        )
+        self.assertEqual(bill.documents[0]["note"], "Fiscal Note & Review")
+        self.assertEqual(
+            version_urls(bill),
+            [("Current Status", ROOT + "Res_Introduced/R12.pdf")],
+        )
+
+    def test_list_item_without_link(self):
+        links = self.scraper._find_list_links(
+            '<li>text</li><li><a href="c.pdf">C</a></li>', BILLS_URL
+        )
+        self.assertEqual(links, [None, (ROOT + "c.pdf", "C")])
+
+        chunk = BILL.replace(
+            "<li><a href='Bill_Status/B5.pdf'>Status</a></li>", "<li>Status</li>"
+        )
+        with self.assertRaises(ValueError):
+            self.scraper._process_bill("37th", chunk, BILLS_URL)
+
+    def test_link_tag_is_not_a_list_item(self):
+        links = self.scraper._find_list_links(
+            '<link rel="x"><a href="z.pdf">Z</a>', BILLS_URL
+        )
+        self.assertEqual(links, [])
+
+    def test_missing_link(self):
+        with self.assertRaises(ValueError):
+            self.scraper._process_bill(
+                "37th", "<p><strong>Bill No. 1-37</strong><br>", BILLS_URL
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import fitz
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from .. import Guam
+from ..bills import GUBillScraper
+
+
+class TestStatusText(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.scraper = GUBillScraper(Guam(), self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_time_on_next_line(self):
+        lines = ["Introduced 1/2/2023", "10:15 a.m.", "Sent 1/5/23 3:00 P.M."]
+        full_dates, days, _ = self.scraper._scan_text(iter(lines))
+        self.assertEqual(full_dates, ["1/2/2023\n10:15 a.m.", "1/5/23 3:00 P.M."])
+        self.assertEqual(days, ["1/2/2023", "1/5/23"])
+
+    def test_committee_across_lines(self):
+        lines = ["Referred 1/3/2023", "to the Committee on ", "Health, Tourism"]
+        _, _, committee = self.scraper._scan_text(iter(lines), find_committee=True)
+        self.assertEqual(committee, "Committee on \nHealth, Tourism")
+
+        lines = ["Committee on Rules, Federal,", "and Foreign Affairs", "1/3/2023"]
+        _, _, committee = self.scraper._scan_text(iter(lines), find_committee=True)
+        self.assertEqual(committee, "Committee on Rules, Federal,\nand Foreign Affairs")
+
+    def test_committee_needs_a_name(self):
+        lines = ["Committee on 5/1/2023"]
+        _, _, committee = self.scraper._scan_text(iter(lines), find_committee=True)
+        self.assertIsNone(committee)
+
+        lines = ["to the Committee on "]
+        _, _, committee = self.scraper._scan_text(iter(lines), find_committee=True)
+        self.assertIsNone(committee)
+
+    def test_early_break(self):
+        lines = iter(
+            [
+                "1/2/2023 10:15 a.m.",
+                "1/3/2023 11:00 a.m.",
+                "unread 1/4/2023",
+            ]
+        )
+        full_dates, days, _ = self.scraper._scan_text(lines)
+        self.assertEqual(full_dates, ["1/2/2023 10:15 a.m.", "1/3/2023 11:00 a.m."])
+        self.assertEqual(days, ["1/2/2023", "1/3/2023"])
+        self.assertEqual(next(lines), "unread 1/4/2023")
+
+    def test_early_break_waits_for_committee(self):
+        lines = iter(
+            [
+                "1/2/2023 10:15 a.m.",
+                "1/3/2023 11:00 a.m.",
+                "1/4/2023 Committee on",
+                "Committee on Health",
+                "and Tourism",
+                "1/5/2023",
+                "unread",
+            ]
+        )
+        _, _, committee = self.scraper._scan_text(lines, find_committee=True)
+        self.assertEqual(committee, "Committee on Health\nand Tourism")
+        self.assertEqual(next(lines), "unread")
+
+    def test_pages_read_lazily(self):
+        pdf = fitz.open()
+        for text in [
+            "BILL HISTORY\n1/2/2023 10:15 a.m.\n1/3/2023 11:00 a.m.",
+            "x",
+            "y",
+        ]:
+            pdf.new_page().insert_text((72, 72), text)
+        response = mock.Mock(content=pdf.tobytes())
+        get_text = fitz.Page.get_text
+        with mock.patch.object(self.scraper, "get", return_value=response):
+            with mock.patch.object(
+                fitz.Page, "get_text", autospec=True, side_effect=get_text
+            ) as page_text:
+                lines = list(self.scraper._iter_text("status.pdf"))
+                self.assertEqual(page_text.call_count, 3)
+                self.assertNotIn("BILL HISTORY", lines)
+
+                page_text.reset_mock()
+                details = self.scraper._get_resolution_details("status.pdf")
+                self.assertEqual(page_text.call_count, 1)
+        self.assertEqual(details["PresentationDate"].day, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()